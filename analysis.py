@@ -0,0 +1,254 @@
+import math
+import fractions
+import numpy as np
+
+# Same vocabulary as the /plot endpoint and GraphPlot, but backed by NumPy
+# ufuncs so one eval() covers a whole array of x values.
+allowed_names = {"sin": np.sin, "cos": np.cos, "tan": np.tan,
+                 "sqrt": np.sqrt, "log": np.log, "log10": np.log10, "pi": math.pi,
+                 "e": math.e, "abs": np.abs, "pow": np.power}
+
+MAX_INTERVALS = 100000
+MAX_DEPTH = 50
+# Upper bound on unfinished integration panels across all intervals.
+MAX_PANELS = 8 * MAX_INTERVALS
+# Grid searches (roots, extrema) are done in row chunks of about this many cells.
+GRID_CHUNK = 2000000
+# Upper bound on grid cells (intervals * (samples + 1)) one search may evaluate.
+MAX_GRID_CELLS = 50 * GRID_CHUNK
+MAX_TABLE_ROWS = 10 ** 9
+TABLE_CHUNK_ROWS = 65536
+
+
+def evaluate_expression(expression):
+    # The /calculate vocabulary: plain Python arithmetic plus math and fractions.
+    try:
+        allowed_globals = {"__builtins__": None, "math": math, "fractions": fractions}
+        return str(eval(expression, allowed_globals, {}))
+    except Exception as e:
+        return "Error"
+
+
+def compile_function(func_str):
+    code = compile(func_str, "<f(x)>", "eval")
+    for name in code.co_names:
+        if name != "x" and name not in allowed_names:
+            raise NameError(f"name '{name}' is not allowed")
+
+    def f(xs):
+        xs = np.asarray(xs, dtype=float)
+        names = dict(allowed_names)
+        names["x"] = xs
+        with np.errstate(all="ignore"):
+            ys = eval(code, {"__builtins__": {}}, names)
+        return np.broadcast_to(np.asarray(ys, dtype=float), xs.shape)
+    return f
+
+
+def parse_intervals(intervals):
+    arr = np.asarray(intervals, dtype=float)
+    if arr.ndim == 1 and arr.size == 2:
+        arr = arr.reshape(1, 2)
+    if arr.ndim != 2 or arr.shape[1] != 2:
+        raise ValueError("intervals must be a list of [a, b] pairs")
+    if len(arr) > MAX_INTERVALS:
+        raise ValueError(f"at most {MAX_INTERVALS} intervals per request")
+    if not np.all(np.isfinite(arr)) or np.any(arr[:, 0] >= arr[:, 1]):
+        raise ValueError("each interval must satisfy a < b")
+    return arr[:, 0].copy(), arr[:, 1].copy()
+
+
+def integrate(func_str, intervals, tol=1e-9):
+    # Adaptive Simpson over all intervals at once: every pass evaluates the
+    # midpoints of all unfinished panels in a single vectorized call.
+    f = compile_function(func_str)
+    a, b = parse_intervals(intervals)
+    owner = np.arange(len(a))
+    fa, fb = f(a), f(b)
+    m = (a + b) / 2
+    fm = f(m)
+    with np.errstate(all="ignore"):
+        whole = (b - a) / 6 * (fa + 4 * fm + fb)
+    eps = np.full(len(a), tol)
+    totals = np.zeros(len(a))
+    for depth in range(MAX_DEPTH):
+        if len(a) == 0:
+            break
+        lm = (a + m) / 2
+        rm = (m + b) / 2
+        flm, frm = f(np.concatenate([lm, rm])).reshape(2, -1)
+        with np.errstate(all="ignore"):
+            left = (m - a) / 6 * (fa + 4 * flm + fm)
+            right = (b - m) / 6 * (fm + 4 * frm + fb)
+            delta = left + right - whole
+            # Panels where f is not finite can never converge; finish them so
+            # their interval comes out as NaN instead of splitting forever.
+            done = (np.abs(delta) <= 15 * eps) | ~np.isfinite(delta) | ~np.isfinite(whole)
+            if depth == MAX_DEPTH - 1 or 2 * np.count_nonzero(~done) > MAX_PANELS:
+                done[:] = True
+            np.add.at(totals, owner[done], (left + right + delta / 15)[done])
+        keep = ~done
+        a, m, b = a[keep], m[keep], b[keep]
+        fa, fm, fb = fa[keep], fm[keep], fb[keep]
+        lm, rm, flm, frm = lm[keep], rm[keep], flm[keep], frm[keep]
+        left, right = left[keep], right[keep]
+        owner, eps = owner[keep], eps[keep] / 2
+        a, m, b = np.concatenate([a, m]), np.concatenate([lm, rm]), np.concatenate([m, b])
+        fa, fm, fb = np.concatenate([fa, fm]), np.concatenate([flm, frm]), np.concatenate([fm, fb])
+        whole = np.concatenate([left, right])
+        owner, eps = np.concatenate([owner, owner]), np.concatenate([eps, eps])
+    return totals
+
+
+def _check_grid(a, samples):
+    if samples < 1:
+        raise ValueError("samples must be at least 1")
+    if len(a) * (samples + 1) > MAX_GRID_CELLS:
+        raise ValueError(f"intervals * (samples + 1) must not exceed {MAX_GRID_CELLS}")
+
+
+def _grid_chunks(a, b, samples):
+    rows = max(1, GRID_CHUNK // (samples + 1))
+    t = np.linspace(0.0, 1.0, samples + 1)
+    for start in range(0, len(a), rows):
+        ca, cb = a[start:start + rows], b[start:start + rows]
+        yield ca, cb, ca[:, None] + (cb - ca)[:, None] * t[None, :]
+
+
+def find_roots(func_str, intervals, samples=1000, tol=1e-12):
+    f = compile_function(func_str)
+    a, b = parse_intervals(intervals)
+    _check_grid(a, samples)
+    roots = []
+    for ca, cb, grid in _grid_chunks(a, b, samples):
+        roots.extend(_roots_on_grid(f, ca, grid, tol))
+    return roots
+
+
+def _roots_on_grid(f, a, grid, tol):
+    # Sign changes on a uniform grid give brackets, which are then bisected
+    # together until every bracket is narrower than tol.
+    values = f(grid)
+    exact = values == 0
+    change = (np.sign(values[:, :-1]) * np.sign(values[:, 1:]) < 0)
+    owner_exact, col_exact = np.nonzero(exact)
+    owner, col = np.nonzero(change)
+    lo, hi = grid[owner, col], grid[owner, col + 1]
+    flo = values[owner, col]
+    bracket_f = np.maximum(np.abs(flo), np.abs(values[owner, col + 1]))
+    # An infinite grid value means the bracket ends on a pole.
+    bracket_f[~np.isfinite(bracket_f)] = -np.inf
+    for _ in range(200):
+        if len(lo) == 0 or np.all(hi - lo <= tol * np.maximum(1.0, np.abs(lo))):
+            break
+        mid = (lo + hi) / 2
+        fmid = f(mid)
+        left = np.sign(fmid) * np.sign(flo) <= 0
+        hi = np.where(left, mid, hi)
+        lo = np.where(left, lo, mid)
+        flo = np.where(left, flo, fmid)
+    roots = [[] for _ in range(len(a))]
+    mids = (lo + hi) / 2
+    # Bisection on a pole also converges. A real root keeps |f| below
+    # the larger original grid value of its bracket, a pole makes it grow.
+    with np.errstate(all="ignore"):
+        shrunk = np.abs(f(mids)) <= bracket_f
+    candidates = np.concatenate([mids[shrunk], grid[owner_exact, col_exact]])
+    owners = np.concatenate([owner[shrunk], owner_exact])
+    for i, r in sorted(zip(owners, candidates), key=lambda p: (p[0], p[1])):
+        roots[i].append(float(r))
+    return roots
+
+
+def derivative(func_str, xs, order=1, h=None):
+    f = compile_function(func_str)
+    xs = np.asarray(xs, dtype=float)
+    if xs.size > MAX_INTERVALS:
+        raise ValueError(f"at most {MAX_INTERVALS} points per request")
+    if h is None:
+        step = np.cbrt(np.finfo(float).eps) if order == 1 else np.finfo(float).eps ** 0.25
+        h = step * np.maximum(1.0, np.abs(xs))
+    if order == 1:
+        return (f(xs + h) - f(xs - h)) / (2 * h)
+    if order == 2:
+        return (f(xs + h) - 2 * f(xs) + f(xs - h)) / (h * h)
+    raise ValueError("order must be 1 or 2")
+
+
+def _golden_search(f, lo, hi, sign, iterations=100):
+    ratio = (math.sqrt(5) - 1) / 2
+    c = hi - ratio * (hi - lo)
+    d = lo + ratio * (hi - lo)
+    fc, fd = sign * f(c), sign * f(d)
+    for _ in range(iterations):
+        left = fc < fd
+        hi = np.where(left, d, hi)
+        lo = np.where(left, lo, c)
+        c = hi - ratio * (hi - lo)
+        d = lo + ratio * (hi - lo)
+        fc, fd = sign * f(c), sign * f(d)
+    return (lo + hi) / 2
+
+
+def find_extrema(func_str, intervals, samples=1000):
+    f = compile_function(func_str)
+    a, b = parse_intervals(intervals)
+    _check_grid(a, samples)
+    parts = [_extrema_on_grid(f, ca, cb, grid, samples) for ca, cb, grid in _grid_chunks(a, b, samples)]
+    return {key: (np.concatenate([p[key][0] for p in parts]), np.concatenate([p[key][1] for p in parts]))
+            for key in ("min", "max")}
+
+
+def _extrema_on_grid(f, a, b, grid, samples):
+    # Coarse grid search per interval, then golden-section refinement around
+    # the best grid point; interval endpoints stay candidates.
+    values = f(grid)
+    rows = np.arange(len(a))
+    step = (b - a) / samples
+    result = {}
+    for key, sign in (("min", 1.0), ("max", -1.0)):
+        scored = np.where(np.isnan(values), np.inf, sign * values)
+        idx = np.argmin(scored, axis=1)
+        best_x = grid[rows, idx]
+        lo = np.maximum(a, best_x - step)
+        hi = np.minimum(b, best_x + step)
+        refined = _golden_search(f, lo, hi, sign)
+        better = sign * f(refined) < sign * f(best_x)
+        xs = np.where(better, refined, best_x)
+        result[key] = (xs, f(xs))
+    return result
+
+
+def _format_value(v):
+    return repr(v) if math.isfinite(v) else ""
+
+
+def generate_table(func_str, x_min, x_max, step, fmt="csv", chunk_rows=TABLE_CHUNK_ROWS):
+    # Validates eagerly, then returns an iterator over text chunks of at most
+    # chunk_rows rows each, so the table is never held in memory as a whole.
+    f = compile_function(func_str)
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError("format must be 'csv' or 'ndjson'")
+    if not (step > 0 and math.isfinite(step)) or x_min > x_max:
+        raise ValueError("step must be positive and x_min must not exceed x_max")
+    rows = int(math.floor((x_max - x_min) / step + 1e-9)) + 1
+    if rows > MAX_TABLE_ROWS:
+        raise ValueError(f"at most {MAX_TABLE_ROWS} rows per table")
+    # Names are checked at compile time only; evaluate a couple of rows now so
+    # runtime errors (wrong arity, bad operands) surface before streaming.
+    f(x_min + np.arange(min(rows, 2)) * step)
+    return _table_chunks(f, x_min, step, rows, fmt, chunk_rows)
+
+
+def _table_chunks(f, x_min, step, rows, fmt, chunk_rows):
+    if fmt == "csv":
+        yield "x,f(x)\n"
+    for start in range(0, rows, chunk_rows):
+        xs = x_min + np.arange(start, min(start + chunk_rows, rows)) * step
+        ys = f(xs)
+        if fmt == "csv":
+            yield "".join(f"{_format_value(x)},{_format_value(y)}\n"
+                          for x, y in zip(xs.tolist(), ys.tolist()))
+        else:
+            yield "".join(f'{{"x": {_format_value(x) or "null"}, "y": {_format_value(y) or "null"}}}\n'
+                          for x, y in zip(xs.tolist(), ys.tolist()))
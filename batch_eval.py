@@ -0,0 +1,120 @@
+import argparse
+import collections
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+import analysis
+
+CHUNK_LINES = 2000
+# Chunks submitted ahead of the one being written, per worker. Keeps memory
+# bounded no matter how long the input is.
+PENDING_PER_WORKER = 4
+
+
+def evaluate_line(line):
+    # Plain lines are /calculate expressions. Lines starting with "{" are JSON
+    # jobs: {"expression": ...} or {"function": "f(x)", "x": number or list}.
+    line = line.rstrip("\n")
+    if not line.lstrip().startswith("{"):
+        result = analysis.evaluate_expression(line)
+        return line, result, result == "Error"
+    try:
+        job = json.loads(line)
+        if "expression" in job:
+            result = analysis.evaluate_expression(job["expression"])
+            return line, result, result == "Error"
+        ys = analysis.compile_function(job["function"])(job.get("x", 0))
+        if ys.ndim == 0:
+            return line, float(ys) if math.isfinite(ys) else None, False
+        return line, [float(y) if math.isfinite(y) else None for y in ys.tolist()], False
+    except Exception as e:
+        return line, "Error", True
+
+
+def evaluate_chunk(lines):
+    return [evaluate_line(line) for line in lines]
+
+
+def chunked(lines, size):
+    it = iter(lines)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def evaluate_stream(lines, workers=None, chunk_lines=CHUNK_LINES):
+    # Yields evaluated lines in input order, skipping blank ones. With more
+    # than one worker, chunks go to a process pool and at most
+    # workers * PENDING_PER_WORKER of them are in flight at any time.
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked((line for line in lines if line.strip()), chunk_lines)
+    if workers == 1:
+        for chunk in chunks:
+            yield from evaluate_chunk(chunk)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(evaluate_chunk, (chunk,)))
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def format_result(line, result, fmt):
+    if fmt == "ndjson":
+        return json.dumps({"input": line, "result": result}, ensure_ascii=False) + "\n"
+    if isinstance(result, list):
+        result = ", ".join("nan" if y is None else repr(y) for y in result)
+    elif result is None:
+        result = "nan"
+    return f"{line} = {result}\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate calculator expressions and f(x) jobs in batch.")
+    parser.add_argument("input", nargs="?", default="-", help="input file, one job per line (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=["text", "ndjson"], default="text")
+    parser.add_argument("--chunk-lines", type=int, default=CHUNK_LINES)
+    parser.add_argument("--progress", type=float, default=0,
+                        help="print throughput to stderr every N seconds (0 disables)")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    count = errors = 0
+    start = last_report = time.perf_counter()
+    try:
+        for line, result, failed in evaluate_stream(source, args.workers, args.chunk_lines):
+            target.write(format_result(line, result, args.format))
+            count += 1
+            errors += failed
+            if args.progress and count % 1000 == 0:
+                now = time.perf_counter()
+                if now - last_report >= args.progress:
+                    last_report = now
+                    print(f"{count} lines, {count / (now - start):.0f} lines/s", file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+        else:
+            target.flush()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0
+    print(f"{count} lines ({errors} errors) in {elapsed:.2f} s, {rate:.0f} lines/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
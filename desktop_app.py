@@ -5,11 +5,15 @@ import fractions
 import csv
 import os
 import json
-import datetime
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
+from tkinter import filedialog
 import webbrowser
+import analysis
+import matrix_mode
+import stats_mode
+from history import HistoryStore
 
 try:
     from fpdf import FPDF
@@ -50,7 +54,7 @@ class App(ctk.CTk):
         container.grid_columnconfigure(0, weight=1)
         
         self.frames = {}
-        for F in (MainMenu, SimpleCalc, AdvancedCalc, Converter, GraphPlot):
+        for F in (MainMenu, SimpleCalc, AdvancedCalc, MatrixCalc, Converter, GraphPlot, StatsMode):
             frame = F(container, self)
             self.frames[F.__name__] = frame
             frame.grid(row=0, column=0, sticky="nsew")
@@ -106,6 +110,10 @@ class MainMenu(ctk.CTkFrame):
                                      command=lambda: controller.show_frame("AdvancedCalc"))
         btn_advanced.pack(pady=10, padx=20, fill="x")
         
+        btn_matrix = ctk.CTkButton(self, text="Матриці та вектори", font=("Helvetica", 18),
+                                   command=lambda: controller.show_frame("MatrixCalc"))
+        btn_matrix.pack(pady=10, padx=20, fill="x")
+        
         btn_converter = ctk.CTkButton(self, text="Конвертор", font=("Helvetica", 18),
                                       command=lambda: controller.show_frame("Converter"))
         btn_converter.pack(pady=10, padx=20, fill="x")
@@ -114,6 +122,10 @@ class MainMenu(ctk.CTkFrame):
                                   command=lambda: controller.show_frame("GraphPlot"))
         btn_graph.pack(pady=10, padx=20, fill="x")
         
+        btn_stats = ctk.CTkButton(self, text="Статистика даних", font=("Helvetica", 18),
+                                  command=lambda: controller.show_frame("StatsMode"))
+        btn_stats.pack(pady=10, padx=20, fill="x")
+        
         btn_web = ctk.CTkButton(self, text="Відкрити веб-версію", font=("Helvetica", 18),
                                 command=launch_web_interface)
         btn_web.pack(pady=10, padx=20, fill="x")
@@ -244,7 +256,7 @@ class AdvancedCalc(ctk.CTkFrame):
         self.expression = ""
         self.last_result = ""
         self.memory = 0
-        self.history_list = []
+        self.history = HistoryStore()
         self.history_sort_ascending = True
         self.load_history()
         
@@ -405,7 +417,7 @@ class AdvancedCalc(ctk.CTkFrame):
                 self.controller.clipboard_append(self.display_var.get())
             elif text == 'Save':
                 with open("advanced_history_export.txt", "w") as f:
-                    f.write("".join([entry for _, entry in self.history_list]))
+                    f.writelines(self.history.texts())
             else:
                 self.expression += text
             self.display_var.set(self.expression)
@@ -414,20 +426,15 @@ class AdvancedCalc(ctk.CTkFrame):
             self.display_var.set("Error")
     
     def add_history(self, expr, result):
-        ts = datetime.datetime.now()
-        ts_str = ts.strftime("%Y-%m-%d %H:%M:%S")
-        entry_text = f"{ts_str}: {expr} = {result}\n"
-        self.history_list.append((ts, entry_text))
-        self.append_history_to_file(entry_text)
+        self.history.add(expr, result)
+        self.append_history_to_file(self.history.entry_text(len(self.history) - 1))
         self.update_history_text()
     
     def update_history_text(self, filter_text=""):
         self.history_text.configure(state="normal")
         self.history_text.delete("1.0", "end")
-        sorted_history = sorted(self.history_list, key=lambda x: x[0], reverse=not self.history_sort_ascending)
-        for ts, entry_text in sorted_history:
-            if filter_text.lower() in entry_text.lower():
-                self.history_text.insert("end", entry_text)
+        indices = self.history.filter_indices(filter_text, self.history.order(self.history_sort_ascending))
+        self.history_text.insert("end", "".join(self.history.texts(indices)))
         self.history_text.configure(state="disabled")
     
     def search_history(self):
@@ -439,7 +446,7 @@ class AdvancedCalc(ctk.CTkFrame):
         self.update_history_text()
     
     def clear_history(self):
-        self.history_list = []
+        self.history.clear()
         self.update_history_text()
         if os.path.exists(self.HISTORY_FILE):
             os.remove(self.HISTORY_FILE)
@@ -448,12 +455,7 @@ class AdvancedCalc(ctk.CTkFrame):
         if os.path.exists(self.HISTORY_FILE):
             with open(self.HISTORY_FILE, "r") as f:
                 for line in f:
-                    try:
-                        ts_str, rest = line.split(":", 1)
-                        ts = datetime.datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-                    except:
-                        ts = datetime.datetime.now()
-                    self.history_list.append((ts, line))
+                    self.history.load_line(line)
     
     def append_history_to_file(self, entry):
         with open(self.HISTORY_FILE, "a") as f:
@@ -463,7 +465,7 @@ class AdvancedCalc(ctk.CTkFrame):
         with open("advanced_history.csv", "w", newline="", encoding="utf-8") as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(["Обчислення"])
-            for _, entry in self.history_list:
+            for entry in self.history.texts():
                 writer.writerow([entry.strip()])
     
     def export_history_pdf(self):
@@ -473,7 +475,7 @@ class AdvancedCalc(ctk.CTkFrame):
         pdf = FPDF()
         pdf.add_page()
         pdf.set_font("Arial", size=12)
-        for _, entry in self.history_list:
+        for entry in self.history.texts():
             pdf.cell(200, 10, txt=entry.strip(), ln=True)
         pdf.output("advanced_history.pdf")
     
@@ -482,10 +484,7 @@ class AdvancedCalc(ctk.CTkFrame):
         self.update_history_text()
     
     def plot_history(self):
-        date_counts = {}
-        for ts, _ in self.history_list:
-            d = ts.date()
-            date_counts[d] = date_counts.get(d, 0) + 1
+        date_counts = self.history.day_counts()
         if not date_counts:
             return
         dates = sorted(date_counts.keys())
@@ -504,6 +503,51 @@ class AdvancedCalc(ctk.CTkFrame):
         self.display_entry.configure(font=font)
         self.history_text.configure(font=("Helvetica", 12))
 
+class MatrixCalc(ctk.CTkFrame):
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        
+        input_label = ctk.CTkLabel(self, text="Вираз, наприклад: inv([[1,2],[3,4]]) @ [5,6]", font=("Helvetica", 16))
+        input_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+        self.input_text = ctk.CTkTextbox(self, height=120, font=("Courier", self.controller.settings.get("font_size", 18)))
+        self.input_text.grid(row=1, column=0, padx=10, pady=5, sticky="nsew")
+        
+        calc_btn = ctk.CTkButton(self, text="Обчислити", font=("Helvetica", 16), command=self.calculate)
+        calc_btn.grid(row=2, column=0, padx=10, pady=10, sticky="ew")
+        
+        self.result_text = ctk.CTkTextbox(self, font=("Courier", 14), wrap="none")
+        self.result_text.grid(row=3, column=0, padx=10, pady=5, sticky="nsew")
+        self.result_text.configure(state="disabled")
+        
+        functions_label = ctk.CTkLabel(self, text="+ - * / ** поелементно, @ множення матриць; T, det, inv, solve, eig, "
+                                                  "trace, rank, norm, zeros, ones, eye, rand",
+                                       font=("Helvetica", 12))
+        functions_label.grid(row=4, column=0, padx=10, pady=5, sticky="w")
+        
+        back_btn = ctk.CTkButton(self, text="Назад", font=("Helvetica", 16),
+                                 command=lambda: self.controller.show_frame("MainMenu"))
+        back_btn.grid(row=5, column=0, padx=10, pady=10, sticky="ew")
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_rowconfigure(3, weight=2)
+    
+    def calculate(self):
+        try:
+            result = matrix_mode.format_result(matrix_mode.evaluate(self.input_text.get("1.0", "end").strip()))
+        except ValueError as e:
+            result = f"Помилка: {e}"
+        except Exception as e:
+            result = "Error"
+        self.result_text.configure(state="normal")
+        self.result_text.delete("1.0", "end")
+        self.result_text.insert("end", result)
+        self.result_text.configure(state="disabled")
+    
+    def apply_settings(self, settings):
+        self.input_text.configure(font=("Courier", settings.get("font_size", 18)))
+
 class Converter(ctk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent)
@@ -689,20 +733,35 @@ class GraphPlot(ctk.CTkFrame):
         self.xmax_entry = ctk.CTkEntry(self, font=("Helvetica", 16))
         self.xmax_entry.grid(row=2, column=1, padx=10, pady=10, sticky="ew")
         
+        step_label = ctk.CTkLabel(self, text="Крок таблиці:", font=("Helvetica", 16))
+        step_label.grid(row=3, column=0, padx=10, pady=10, sticky="w")
+        self.step_entry = ctk.CTkEntry(self, font=("Helvetica", 16))
+        self.step_entry.grid(row=3, column=1, padx=10, pady=10, sticky="ew")
+        
         plot_btn = ctk.CTkButton(self, text="Побудувати графік", font=("Helvetica", 16), command=self.plot_function)
-        plot_btn.grid(row=3, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
+        plot_btn.grid(row=4, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
         
         export_btn = ctk.CTkButton(self, text="Експорт графіка", font=("Helvetica", 16), command=self.export_graph)
-        export_btn.grid(row=4, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
+        export_btn.grid(row=5, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
+        
+        export_table_btn = ctk.CTkButton(self, text="Експорт таблиці CSV", font=("Helvetica", 16), command=self.export_table)
+        export_table_btn.grid(row=6, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
+        
+        analyze_btn = ctk.CTkButton(self, text="Аналіз функції", font=("Helvetica", 16), command=self.analyze_function)
+        analyze_btn.grid(row=7, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
+        
+        self.analysis_var = tk.StringVar()
+        analysis_label = ctk.CTkLabel(self, textvariable=self.analysis_var, font=("Helvetica", 14), justify="left")
+        analysis_label.grid(row=8, column=0, columnspan=2, padx=10, pady=5, sticky="w")
         
         self.figure = plt.Figure(figsize=(5,3), dpi=100)
         self.ax = self.figure.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.figure, master=self)
-        self.canvas.get_tk_widget().grid(row=5, column=0, columnspan=2, padx=10, pady=10)
+        self.canvas.get_tk_widget().grid(row=9, column=0, columnspan=2, padx=10, pady=10)
         
         back_btn = ctk.CTkButton(self, text="Назад", font=("Helvetica", 16),
                                  command=lambda: self.controller.show_frame("MainMenu"))
-        back_btn.grid(row=6, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
+        back_btn.grid(row=10, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
         
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
@@ -735,6 +794,43 @@ class GraphPlot(ctk.CTkFrame):
             self.ax.text(0.5, 0.5, "Помилка у введенні функції", transform=self.ax.transAxes, ha="center")
             self.canvas.draw()
     
+    def analyze_function(self):
+        try:
+            func_str = self.func_entry.get()
+            interval = [[float(self.xmin_entry.get()), float(self.xmax_entry.get())]]
+            integral = analysis.integrate(func_str, interval)[0]
+            roots = analysis.find_roots(func_str, interval)[0]
+            found = analysis.find_extrema(func_str, interval)
+            min_x, min_y = found["min"][0][0], found["min"][1][0]
+            max_x, max_y = found["max"][0][0], found["max"][1][0]
+            roots_str = ", ".join(f"{r:.6g}" for r in roots) if roots else "немає"
+            self.analysis_var.set(
+                f"Інтеграл: {integral:.10g}\n"
+                f"Корені: {roots_str}\n"
+                f"Мінімум: f({min_x:.6g}) = {min_y:.6g}\n"
+                f"Максимум: f({max_x:.6g}) = {max_y:.6g}"
+            )
+        except Exception as e:
+            self.analysis_var.set("Помилка у введенні функції або діапазону")
+    
+    def export_table(self):
+        filename = "function_table.csv"
+        try:
+            chunks = analysis.generate_table(self.func_entry.get(), float(self.xmin_entry.get()),
+                                             float(self.xmax_entry.get()), float(self.step_entry.get()))
+        except Exception as e:
+            tk.messagebox.showerror("Помилка", "Перевірте функцію, діапазон та крок")
+            return
+        def write_table():
+            try:
+                with open(filename, "w", encoding="utf-8") as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+                self.after(0, lambda: tk.messagebox.showinfo("Експорт", f"Таблицю збережено у файл {filename}"))
+            except Exception as e:
+                self.after(0, lambda: tk.messagebox.showerror("Помилка", "Не вдалося зберегти таблицю"))
+        threading.Thread(target=write_table, daemon=True).start()
+    
     def export_graph(self):
         try:
             filename = "graph_export.png"
@@ -746,6 +842,85 @@ class GraphPlot(ctk.CTkFrame):
     def apply_settings(self, settings):
         pass
 
+class StatsMode(ctk.CTkFrame):
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        
+        file_label = ctk.CTkLabel(self, text="Файл (CSV або .npy):", font=("Helvetica", 16))
+        file_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+        self.file_entry = ctk.CTkEntry(self, font=("Helvetica", 16))
+        self.file_entry.grid(row=0, column=1, padx=10, pady=10, sticky="ew")
+        browse_btn = ctk.CTkButton(self, text="Обрати файл", font=("Helvetica", 16), command=self.browse_file)
+        browse_btn.grid(row=0, column=2, padx=10, pady=10)
+        
+        column_label = ctk.CTkLabel(self, text="Стовпець (назва або номер):", font=("Helvetica", 16))
+        column_label.grid(row=1, column=0, padx=10, pady=10, sticky="w")
+        self.column_entry = ctk.CTkEntry(self, font=("Helvetica", 16))
+        self.column_entry.insert(0, "0")
+        self.column_entry.grid(row=1, column=1, padx=10, pady=10, sticky="ew")
+        
+        self.compute_btn = ctk.CTkButton(self, text="Обчислити статистику", font=("Helvetica", 16),
+                                         command=self.compute_stats)
+        self.compute_btn.grid(row=2, column=0, columnspan=3, padx=10, pady=10, sticky="ew")
+        
+        self.result_var = tk.StringVar()
+        result_label = ctk.CTkLabel(self, textvariable=self.result_var, font=("Helvetica", 14), justify="left")
+        result_label.grid(row=3, column=0, columnspan=3, padx=10, pady=5, sticky="w")
+        
+        self.figure = plt.Figure(figsize=(5,3), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().grid(row=4, column=0, columnspan=3, padx=10, pady=10)
+        
+        back_btn = ctk.CTkButton(self, text="Назад", font=("Helvetica", 16),
+                                 command=lambda: self.controller.show_frame("MainMenu"))
+        back_btn.grid(row=5, column=0, columnspan=3, padx=10, pady=10, sticky="ew")
+        
+        self.grid_columnconfigure(1, weight=1)
+    
+    def browse_file(self):
+        path = filedialog.askopenfilename(filetypes=[("CSV", "*.csv"), ("NumPy", "*.npy"), ("Усі файли", "*.*")])
+        if path:
+            self.file_entry.delete(0, "end")
+            self.file_entry.insert(0, path)
+    
+    def compute_stats(self):
+        path = self.file_entry.get()
+        column = self.column_entry.get().strip() or "0"
+        self.compute_btn.configure(state="disabled")
+        self.result_var.set("Обчислення...")
+        def worker():
+            try:
+                summary = stats_mode.compute_file(path, column=column)
+            except Exception as e:
+                summary = None
+            self.after(0, lambda: self.show_stats(summary))
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def show_stats(self, summary):
+        self.compute_btn.configure(state="normal")
+        self.ax.clear()
+        if summary is None or summary["count"] == 0:
+            self.result_var.set("Не вдалося прочитати числові дані з файлу")
+            self.canvas.draw()
+            return
+        quantiles = ", ".join(f"{float(q)*100:g}%: {v:.6g}" for q, v in summary["quantiles"].items())
+        self.result_var.set(
+            f"Кількість: {summary['count']} (пропущено рядків: {summary['skipped']})\n"
+            f"Середнє: {summary['mean']:.6g}   Дисперсія: {summary['variance']:.6g}   "
+            f"Ст. відхилення: {summary['std']:.6g}\n"
+            f"Мін: {summary['min']:.6g}   Макс: {summary['max']:.6g}\n"
+            f"Квантилі{'' if summary['quantiles_exact'] else ' (наближені)'}: {quantiles}"
+        )
+        edges = summary["histogram"]["edges"]
+        self.ax.stairs(summary["histogram"]["counts"], edges, fill=True)
+        self.ax.set_title("Гістограма")
+        self.canvas.draw()
+    
+    def apply_settings(self, settings):
+        pass
+
 class HelpWindow(ctk.CTkToplevel):
     def __init__(self, parent):
         super().__init__(parent)
@@ -755,9 +930,14 @@ class HelpWindow(ctk.CTkToplevel):
             "1. Звичайний калькулятор: базові арифметичні операції.\n"
             "2. Складний калькулятор: розширені функції (тригонометрія, логарифми, дроби, пам'ять, історія).\n"
             "   - Історія зберігається між сесіями. Можна шукати, сортувати та експортувати історію в CSV або PDF.\n"
+            "   - Матриці та вектори: вирази з літералами [...] (поелементні операції, @, T, det, inv, solve, eig).\n"
             "3. Конвертор: конвертація одиниць за категоріями (довжина, об’єм, температура, вага, швидкість, енергія, тиск, валюта).\n"
             "   - Для валюти є можливість оновлення курсів.\n"
             "4. Графіки функцій: введіть вираз f(x), вкажіть діапазон x та побудуйте графік. Також можна експортувати графік у PNG.\n"
+            "   - 'Експорт таблиці CSV' зберігає значення x, f(x) з вказаним кроком у файл function_table.csv.\n"
+            "   - Кнопка 'Аналіз функції' обчислює інтеграл, корені, мінімум і максимум на заданому діапазоні.\n"
+            "   - Статистика даних: кількість, середнє, дисперсія, мін/макс, квантилі та гістограма стовпця CSV\n"
+            "     (або .npy), файл читається частинами за один прохід.\n"
             "5. Налаштування: змініть тему, розмір шрифту та гарячі клавіші за бажанням.\n"
             "6. З головного меню можна відкрити веб-версію додатку, яка забезпечує подібний функціонал.\n\n"
             "Для повернення до головного меню використовуйте кнопку 'Назад'."
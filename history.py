@@ -0,0 +1,187 @@
+import datetime
+from array import array
+from collections import Counter
+
+EPOCH = datetime.datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Result kinds. Numbers live directly in the value column; anything else
+# (fractions, "Error", ...) is interned and the value column holds its id.
+KIND_INT = 0
+KIND_FLOAT = 1
+KIND_STRING = 2
+KIND_RAW = 3  # unparseable history line, kept verbatim as the expression
+
+MAX_EXACT_INT = 2 ** 53
+MIN_SLOTS = 1024
+
+
+def to_seconds(when):
+    return (when - EPOCH) // datetime.timedelta(seconds=1)
+
+
+class HistoryStore:
+    # Column-oriented calculation history. Timestamps are naive local time
+    # stored as whole seconds since 1970-01-01, expressions are interned ids,
+    # and display strings are only built when something asks for them.
+    def __init__(self):
+        self.timestamps = array("q")
+        self.expr_ids = array("I")
+        self.values = array("d")
+        self.kinds = array("b")
+        # Interned strings are UTF-8 runs in one buffer; string i is
+        # text[text_offsets[i]:text_offsets[i + 1]].
+        self.text = bytearray()
+        self.text_offsets = array("q", [0])
+        # Open-addressing hash table of string ids, -1 marks a free slot.
+        self.slots = array("q", [-1]) * MIN_SLOTS
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def string_count(self):
+        return len(self.text_offsets) - 1
+
+    def string_bytes(self, string_id):
+        return self.text[self.text_offsets[string_id]:self.text_offsets[string_id + 1]]
+
+    def string(self, string_id):
+        return self.string_bytes(string_id).decode("utf-8")
+
+    def find_slot(self, data):
+        # Slot holding data's id, or the free slot where it belongs.
+        mask = len(self.slots) - 1
+        slot = hash(data) & mask
+        while self.slots[slot] >= 0 and self.string_bytes(self.slots[slot]) != data:
+            slot = (slot + 1) & mask
+        return slot
+
+    def intern(self, text):
+        data = text.encode("utf-8")
+        slot = self.find_slot(data)
+        if self.slots[slot] >= 0:
+            return self.slots[slot]
+        string_id = self.string_count()
+        self.text += data
+        self.text_offsets.append(len(self.text))
+        self.slots[slot] = string_id
+        if 2 * self.string_count() > len(self.slots):
+            self.grow_slots()
+        return string_id
+
+    def grow_slots(self):
+        self.slots = array("q", [-1]) * (2 * len(self.slots))
+        for string_id in range(self.string_count()):
+            self.slots[self.find_slot(bytes(self.string_bytes(string_id)))] = string_id
+
+    def add(self, expr, result, when=None):
+        when = when or datetime.datetime.now()
+        self.append(to_seconds(when), expr, str(result))
+
+    def append(self, seconds, expr, result):
+        kind, value = self.encode_result(result)
+        self.timestamps.append(seconds)
+        self.expr_ids.append(self.intern(expr))
+        self.values.append(value)
+        self.kinds.append(kind)
+
+    def append_raw(self, seconds, text):
+        self.timestamps.append(seconds)
+        self.expr_ids.append(self.intern(text))
+        self.values.append(0.0)
+        self.kinds.append(KIND_RAW)
+
+    def encode_result(self, result):
+        try:
+            number = int(result)
+            if str(number) == result and abs(number) <= MAX_EXACT_INT:
+                return KIND_INT, float(number)
+        except ValueError:
+            pass
+        try:
+            number = float(result)
+            if repr(number) == result:
+                return KIND_FLOAT, number
+        except ValueError:
+            pass
+        return KIND_STRING, float(self.intern(result))
+
+    def result_text(self, i):
+        kind = self.kinds[i]
+        if kind == KIND_INT:
+            return str(int(self.values[i]))
+        if kind == KIND_FLOAT:
+            return repr(self.values[i])
+        if kind == KIND_STRING:
+            return self.string(int(self.values[i]))
+        return ""
+
+    def timestamp(self, i):
+        return EPOCH + datetime.timedelta(seconds=self.timestamps[i])
+
+    def timestamp_text(self, i):
+        return self.timestamp(i).strftime(TIMESTAMP_FORMAT)
+
+    def entry_text(self, i):
+        if self.kinds[i] == KIND_RAW:
+            return self.string(self.expr_ids[i])
+        return f"{self.timestamp_text(i)}: {self.string(self.expr_ids[i])} = {self.result_text(i)}\n"
+
+    def texts(self, indices=None):
+        if indices is None:
+            indices = range(len(self))
+        return (self.entry_text(i) for i in indices)
+
+    def order(self, ascending=True):
+        return sorted(range(len(self)), key=self.timestamps.__getitem__, reverse=not ascending)
+
+    def filter_indices(self, text, indices=None):
+        if indices is None:
+            indices = range(len(self))
+        needle = text.lower()
+        if not needle:
+            return list(indices)
+        # Check each distinct expression/result string once, then only build
+        # the full line when the needle could span or hit the timestamp.
+        string_hits = bytearray(needle in self.string(j).lower() for j in range(self.string_count()))
+        needs_line = (any(c in needle for c in ":=\n") or needle != needle.strip()
+                      or set(needle) <= set("0123456789- "))
+        hits = []
+        for i in indices:
+            kind = self.kinds[i]
+            if string_hits[self.expr_ids[i]]:
+                hits.append(i)
+            elif kind == KIND_STRING and string_hits[int(self.values[i])]:
+                hits.append(i)
+            elif kind in (KIND_INT, KIND_FLOAT) and needle in self.result_text(i).lower():
+                hits.append(i)
+            elif needs_line and needle in self.entry_text(i).lower():
+                hits.append(i)
+        return hits
+
+    def day_counts(self):
+        counts = Counter(seconds // SECONDS_PER_DAY for seconds in self.timestamps)
+        return {(EPOCH + datetime.timedelta(days=day)).date(): n for day, n in counts.items()}
+
+    def clear(self):
+        self.__init__()
+
+    def load_line(self, line):
+        # Lines that would not be reproduced byte for byte are kept raw.
+        try:
+            ts = datetime.datetime.strptime(line[:19], TIMESTAMP_FORMAT)
+        except ValueError:
+            self.append_raw(to_seconds(datetime.datetime.now()), line)
+            return
+        expr, sep, result = line[21:].rstrip("\n").rpartition(" = ")
+        self.append(to_seconds(ts), expr, result)
+        if not sep or self.entry_text(len(self) - 1) != line:
+            self.pop()
+            self.append_raw(to_seconds(ts), line)
+
+    def pop(self):
+        self.timestamps.pop()
+        self.expr_ids.pop()
+        self.values.pop()
+        self.kinds.pop()
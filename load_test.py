@@ -0,0 +1,172 @@
+import argparse
+import json
+import platform
+import random
+import threading
+import time
+import datetime
+import math
+
+import web_interface
+
+CORPORA = {
+    "trivial": {
+        "calculate": ["2+2", "7*6", "10/4", "3-8", "2**10"],
+        "plot": ["x", "x**2", "2*x+1", "abs(x)"],
+    },
+    "trig": {
+        "calculate": ["math.sin(1)**2+math.cos(1)**2", "math.tan(math.pi/4)",
+                      "math.atan2(1, 2)*math.cos(0.5)", "math.sqrt(math.sin(2)**2+1)"],
+        "plot": ["sin(x)*cos(x)", "sin(x)**2+cos(3*x)", "tan(x/4)", "sin(1/(abs(x)+0.1))"],
+    },
+    "pathological": {
+        # Big-integer work is reduced modulo a small number so the result
+        # stays within int-to-str's digit limit and the request succeeds.
+        "calculate": ["+".join(["1"] * 2000), "(" * 90 + "1" + ")" * 90, "2**200000 % 997",
+                      "1/0", "math.factorial(20000) % (10**9 + 7)", "fractions.Fraction(1, 3)**200"],
+        "plot": ["x**x", "1/(x-5)", "log(x)", "sqrt(x-5)", "+".join(["sin(x)"] * 200)],
+    },
+}
+
+DEFAULT_MIX = {"calculate": 6, "plot": 1, "index": 3}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, weight = part.split("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"unknown endpoint '{name}'")
+        mix[name] = float(weight)
+    return mix
+
+
+def make_request(endpoint, corpus, rng):
+    if endpoint == "index":
+        return "GET", "/", None
+    if endpoint == "calculate":
+        return "POST", "/calculate", {"expression": rng.choice(CORPORA[corpus]["calculate"])}
+    x_min = rng.choice([-10, -1, 0, 1])
+    return "POST", "/plot", {"function": rng.choice(CORPORA[corpus]["plot"]),
+                             "x_min": x_min, "x_max": x_min + rng.choice([1, 5, 10])}
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, statuses, elapsed):
+    report = {}
+    for endpoint, values in latencies.items():
+        values = sorted(values)
+        report[endpoint] = {
+            "requests": len(values),
+            "throughput_rps": len(values) / elapsed if elapsed else None,
+            "status_codes": statuses[endpoint],
+            "latency_ms": {
+                "mean": sum(values) / len(values) * 1000 if values else None,
+                "p50": percentile(values, 50) * 1000 if values else None,
+                "p95": percentile(values, 95) * 1000 if values else None,
+                "p99": percentile(values, 99) * 1000 if values else None,
+                "max": values[-1] * 1000 if values else None,
+            },
+        }
+    return report
+
+
+def run(concurrency=8, requests=1000, mix=None, corpus="trivial", seed=0):
+    # Drives web_interface.app in-process through Flask's test client, so no
+    # server or network is involved; each worker thread has its own client.
+    mix = mix or DEFAULT_MIX
+    if corpus not in CORPORA:
+        raise ValueError(f"unknown corpus '{corpus}'")
+    endpoints = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in endpoints]
+    rng = random.Random(seed)
+    plan = [make_request(name, corpus, rng) + (name,)
+            for name in rng.choices(endpoints, weights=weights, k=requests)]
+    latencies = {name: [] for name in endpoints}
+    statuses = {name: {} for name in endpoints}
+    lock = threading.Lock()
+    cursor = iter(plan)
+
+    def worker():
+        client = web_interface.app.test_client()
+        while True:
+            with lock:
+                job = next(cursor, None)
+            if job is None:
+                return
+            method, path, payload, name = job
+            start = time.perf_counter()
+            if method == "GET":
+                response = client.get(path)
+            else:
+                response = client.post(path, json=payload)
+            response.get_data()
+            took = time.perf_counter() - start
+            with lock:
+                latencies[name].append(took)
+                code = str(response.status_code)
+                statuses[name][code] = statuses[name].get(code, 0) + 1
+
+    started_at = datetime.datetime.now().isoformat(timespec="seconds")
+    coalescing_before = web_interface.single_flight.snapshot()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    coalescing_after = web_interface.single_flight.snapshot()
+    coalesced = {name: counts["coalesced"] - coalescing_before.get(name, {}).get("coalesced", 0)
+                 for name, counts in coalescing_after.items()}
+    return {
+        "started_at": started_at,
+        "python": platform.python_version(),
+        "config": {"concurrency": concurrency, "requests": requests, "mix": mix,
+                   "corpus": corpus, "seed": seed},
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed if elapsed else None,
+        "coalesced": coalesced,
+        "endpoints": summarize(latencies, statuses, elapsed),
+    }
+
+
+def print_report(result):
+    print(f"{result['config']['requests']} requests in {result['elapsed_s']:.2f} s "
+          f"({result['throughput_rps']:.1f} req/s), concurrency {result['config']['concurrency']}, "
+          f"corpus {result['config']['corpus']}")
+    print(f"{'endpoint':<10} {'count':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, stats in result["endpoints"].items():
+        lat = stats["latency_ms"]
+        if not stats["requests"]:
+            continue
+        print(f"{name:<10} {stats['requests']:>7} {stats['throughput_rps']:>9.1f} {lat['p50']:>9.2f} "
+              f"{lat['p95']:>9.2f} {lat['p99']:>9.2f} {lat['max']:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test web_interface.app in-process.")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-n", "--requests", type=int, default=1000)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="endpoint weights, e.g. calculate=6,plot=1,index=3")
+    parser.add_argument("--corpus", choices=sorted(CORPORA), default="trivial")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the full result as JSON to this file")
+    args = parser.parse_args(argv)
+    result = run(args.concurrency, args.requests, args.mix, args.corpus, args.seed)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import ast
+import operator
+import numpy as np
+
+# Largest array (in elements) any literal, constructor or intermediate result
+# may have: 2000x2000 float64 is about 32 MB.
+MAX_ELEMENTS = 4000000
+# Total elements one evaluation may allocate, counting every intermediate.
+MAX_TOTAL_ELEMENTS = 4 * MAX_ELEMENTS
+MAX_DISPLAY_ELEMENTS = 10000
+
+BINARY_OPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+              ast.Div: operator.truediv, ast.Pow: operator.pow, ast.MatMult: operator.matmul}
+UNARY_OPS = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+
+
+def check_size(shape):
+    size = int(np.prod(shape, dtype=np.int64)) if len(shape) else 1
+    if size > MAX_ELEMENTS:
+        raise ValueError(f"result would have {size} elements, limit is {MAX_ELEMENTS}")
+    return size
+
+
+def matmul_shape(left, right):
+    # Shape of left @ right, including broadcast stacking dimensions. A 1-D
+    # operand is treated as a row/column, which does not change the size.
+    if not left or not right:
+        raise ValueError("@ needs vector or matrix operands, use * for scalars")
+    left = (1,) + left if len(left) == 1 else left
+    right = right + (1,) if len(right) == 1 else right
+    if left[-1] != right[-2]:
+        raise ValueError(f"@ operands do not match: {left[-1]} columns against {right[-2]} rows")
+    return np.broadcast_shapes(left[:-2], right[:-2]) + (left[-2], right[-1])
+
+
+def to_float(value):
+    # Integers are promoted to float so that ** and / never wrap around.
+    return np.asarray(value) if np.iscomplexobj(value) else np.asarray(value, dtype=float)
+
+
+class Budget:
+    # Running total of elements allocated while evaluating one expression.
+    # reserve() is called with the shape of every array about to be created.
+    def __init__(self):
+        self.used = 0
+
+    def reserve(self, shape):
+        self.used += check_size(shape)
+        if self.used > MAX_TOTAL_ELEMENTS:
+            raise ValueError(f"expression allocates more than {MAX_TOTAL_ELEMENTS} elements in total")
+
+    def charge(self, value):
+        self.reserve(np.shape(value))
+        return value
+
+    def as_array(self, value):
+        if isinstance(value, (list, tuple)):
+            # A literal's elements are already built; size the stacked copy
+            # before NumPy makes it.
+            self.reserve((sum(int(np.size(item)) for item in value),))
+        else:
+            self.reserve(np.shape(value))
+        array = to_float(value)
+        check_size(array.shape)
+        return array
+
+    def binary(self, op, left, right):
+        left, right = to_float(left), to_float(right)
+        if op is operator.matmul:
+            self.reserve(matmul_shape(left.shape, right.shape))
+        else:
+            self.reserve(np.broadcast_shapes(left.shape, right.shape))
+        return op(left, right)
+
+    def constructor(self, fn):
+        def build(rows, cols=None):
+            shape = (int(rows),) if cols is None else (int(rows), int(cols))
+            self.reserve(shape)
+            return fn(shape)
+        return build
+
+    def function(self, fn):
+        return lambda *args: self.charge(fn(*args))
+
+
+FUNCTIONS = {
+    "T": np.transpose, "transpose": np.transpose,
+    "det": np.linalg.det, "inv": np.linalg.inv, "solve": np.linalg.solve,
+    "eig": np.linalg.eigvals, "eigvals": np.linalg.eigvals,
+    "trace": np.trace, "rank": np.linalg.matrix_rank, "norm": np.linalg.norm,
+}
+CONSTRUCTORS = {
+    "zeros": np.zeros, "ones": np.ones, "rand": np.random.random_sample,
+    "eye": lambda shape: np.eye(*shape),
+}
+CONSTANTS = {"pi": np.pi, "e": np.e}
+allowed_names = set(FUNCTIONS) | set(CONSTRUCTORS) | set(CONSTANTS) | {"dot"}
+
+
+class MatrixTransformer(ast.NodeTransformer):
+    # Rewrites the parsed expression so that [...] literals become arrays and
+    # every arithmetic operator goes through Budget.binary(), which checks the
+    # size of the result before NumPy allocates it.
+    def visit_List(self, node):
+        self.generic_visit(node)
+        return ast.Call(func=ast.Name(id="_array", ctx=ast.Load()), args=[node], keywords=[])
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if type(node.op) not in BINARY_OPS:
+            raise ValueError("unsupported operator")
+        op_name = ast.Constant(value=type(node.op).__name__)
+        return ast.Call(func=ast.Name(id="_binary", ctx=ast.Load()),
+                        args=[op_name, node.left, node.right], keywords=[])
+
+    def visit_Call(self, node):
+        # Tuples are only accepted as direct call arguments, and are sized
+        # through _array like list literals.
+        for arg in node.args:
+            if isinstance(arg, ast.Tuple):
+                arg.call_argument = True
+        self.generic_visit(node)
+        node.args = [ast.Call(func=ast.Name(id="_array", ctx=ast.Load()), args=[arg], keywords=[])
+                     if isinstance(arg, ast.Tuple) else arg for arg in node.args]
+        return node
+
+    def generic_visit(self, node):
+        allowed = (ast.Expression, ast.List, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name,
+                   ast.Constant, ast.Load, ast.operator, ast.unaryop, ast.Tuple)
+        if not isinstance(node, allowed) or isinstance(node, ast.UnaryOp) and type(node.op) not in UNARY_OPS:
+            raise ValueError(f"unsupported syntax: {type(node).__name__}")
+        if isinstance(node, ast.Tuple) and not getattr(node, "call_argument", False):
+            raise ValueError("unsupported syntax: Tuple")
+        if isinstance(node, ast.Name) and node.id not in allowed_names:
+            raise NameError(f"name '{node.id}' is not allowed")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, complex)):
+            raise ValueError("only numeric constants are allowed")
+        return super().generic_visit(node)
+
+
+def evaluate(expression):
+    tree = MatrixTransformer().visit(ast.parse(expression, mode="eval"))
+    ast.fix_missing_locations(tree)
+    budget = Budget()
+    names = dict(CONSTANTS)
+    names.update({name: budget.function(fn) for name, fn in FUNCTIONS.items()})
+    names.update({name: budget.constructor(fn) for name, fn in CONSTRUCTORS.items()})
+    names["dot"] = lambda a, b: budget.binary(operator.matmul, a, b)
+    names["_array"] = budget.as_array
+    names["_binary"] = lambda op_name, left, right: budget.binary(BINARY_OPS[getattr(ast, op_name)], left, right)
+    with np.errstate(all="ignore"):
+        result = eval(compile(tree, "<matrix>", "eval"), {"__builtins__": {}}, names)
+        return budget.as_array(result)
+
+
+def format_result(result):
+    return np.array2string(result, precision=6, suppress_small=True, threshold=MAX_DISPLAY_ELEMENTS,
+                           max_line_width=120)
+
+
+def to_json(result):
+    data = {"shape": list(result.shape), "text": format_result(result)}
+    if result.size <= MAX_DISPLAY_ELEMENTS:
+        if np.iscomplexobj(result):
+            data["real"] = finite_list(result.real)
+            data["imag"] = finite_list(result.imag)
+        else:
+            data["result"] = finite_list(result)
+    return data
+
+
+def finite_list(values):
+    return np.where(np.isfinite(values), values, None).tolist()
@@ -0,0 +1,187 @@
+import itertools
+import math
+import numpy as np
+
+CHUNK_ROWS = 262144
+RESERVOIR_SIZE = 100000
+HISTOGRAM_BINS = 64
+MAX_HISTOGRAM_BINS = 4096
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class StreamingStats:
+    # Single-pass summary with bounded memory: exact count/mean/variance/min/max
+    # (chunk results merged with Chan's formula), quantiles from a uniform
+    # reservoir sample, and a fixed number of histogram bins whose width
+    # doubles whenever new data falls outside the current range.
+    def __init__(self, bins=HISTOGRAM_BINS, reservoir_size=RESERVOIR_SIZE, seed=0):
+        if bins < 2 or bins % 2 or bins > MAX_HISTOGRAM_BINS:
+            raise ValueError(f"bins must be an even number between 2 and {MAX_HISTOGRAM_BINS}")
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.bins = bins
+        self.hist_lo = None
+        self.hist_width = None
+        self.hist_counts = np.zeros(bins, dtype=np.int64)
+        self.reservoir = np.empty(reservoir_size)
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        n = len(values)
+        if n == 0:
+            return
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.update_reservoir(values)
+        self.count = total
+        self.update_histogram(values)
+
+    def update_reservoir(self, values):
+        # Algorithm R, vectorized over the chunk.
+        size = len(self.reservoir)
+        filled = min(self.count, size)
+        take = min(size - filled, len(values))
+        self.reservoir[filled:filled + take] = values[:take]
+        rest = values[take:]
+        if len(rest):
+            positions = self.count + take + np.arange(len(rest))
+            slots = self.rng.integers(0, positions + 1)
+            keep = slots < size
+            self.reservoir[slots[keep]] = rest[keep]
+
+    def update_histogram(self, values):
+        lo, hi = values.min(), values.max()
+        if self.hist_lo is None:
+            self.hist_lo = lo
+            self.hist_width = (hi - lo) / self.bins if hi > lo else max(abs(lo), 1.0) / self.bins
+        while lo < self.hist_lo or hi > self.hist_lo + self.hist_width * self.bins:
+            self.widen_histogram(extend_down=lo < self.hist_lo)
+        idx = ((values - self.hist_lo) / self.hist_width).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        self.hist_counts += np.bincount(idx, minlength=self.bins)
+
+    def widen_histogram(self, extend_down):
+        merged = self.hist_counts.reshape(-1, 2).sum(axis=1)
+        counts = np.zeros(self.bins, dtype=np.int64)
+        half = self.bins // 2
+        if extend_down:
+            counts[half:] = merged
+            self.hist_lo -= self.hist_width * self.bins
+        else:
+            counts[:half] = merged
+        self.hist_counts = counts
+        self.hist_width *= 2
+
+    def quantiles(self, qs=QUANTILES):
+        sample = self.reservoir[:min(self.count, len(self.reservoir))]
+        if len(sample) == 0:
+            return {}
+        return {str(q): float(v) for q, v in zip(qs, np.quantile(sample, qs))}
+
+    def summary(self):
+        if self.count == 0:
+            return {"count": 0}
+        variance = self.m2 / (self.count - 1) if self.count > 1 else 0.0
+        # Widening can leave empty bins at either end; report only the occupied span.
+        occupied = np.flatnonzero(self.hist_counts)
+        first, last = occupied[0], occupied[-1] + 1
+        edges = self.hist_lo + self.hist_width * np.arange(first, last + 1)
+        return {
+            "count": self.count,
+            "mean": float(self.mean),
+            "variance": float(variance),
+            "std": math.sqrt(variance),
+            "min": float(self.min),
+            "max": float(self.max),
+            "quantiles": self.quantiles(),
+            "quantiles_exact": self.count <= len(self.reservoir),
+            "histogram": {"edges": edges.tolist(), "counts": self.hist_counts[first:last].tolist()},
+        }
+
+
+def resolve_column(header, column, delimiter):
+    names = [name.strip() for name in header.rstrip("\r\n").split(delimiter)]
+    if str(column) in names:
+        return names.index(str(column))
+    try:
+        return int(column)
+    except ValueError:
+        raise ValueError(f"column '{column}' not found")
+
+
+def parse_lines(lines, column, delimiter):
+    # Fast path through np.loadtxt; a chunk with a bad row falls back to
+    # parsing line by line so that only that row is skipped.
+    try:
+        return np.loadtxt(lines, delimiter=delimiter, usecols=column, ndmin=1, comments=None), 0
+    except ValueError:
+        values = []
+        for line in lines:
+            try:
+                values.append(float(line.split(delimiter)[column]))
+            except (ValueError, IndexError):
+                pass
+        return np.array(values), len(lines) - len(values)
+
+
+def iter_csv_column(stream, column=0, delimiter=",", header=True, chunk_rows=CHUNK_ROWS):
+    # stream is any iterable of text lines; only chunk_rows of them are held
+    # in memory at a time.
+    if header:
+        column = resolve_column(next(stream, ""), column, delimiter)
+    else:
+        column = int(column)
+    while True:
+        chunk = list(itertools.islice(stream, chunk_rows))
+        if not chunk:
+            return
+        lines = [line for line in chunk if line.strip()]
+        if lines:
+            yield parse_lines(lines, column, delimiter)
+
+
+def iter_npy(path, column=0, chunk_rows=CHUNK_ROWS):
+    # A 1-D array is a single column; a 2-D array is rows x columns and only
+    # the chosen column is copied out of the memory map.
+    try:
+        column = int(column)
+    except ValueError:
+        raise ValueError(f"column '{column}' not found, .npy columns are numbered from 0")
+    data = np.load(path, mmap_mode="r")
+    if data.ndim == 1:
+        data = data.reshape(-1, 1)
+    if data.ndim != 2:
+        raise ValueError(f"expected a 1-D or 2-D array, got {data.ndim}-D")
+    if not -data.shape[1] <= column < data.shape[1]:
+        raise ValueError(f"column {column} out of range, the array has {data.shape[1]} columns")
+    for start in range(0, len(data), chunk_rows):
+        yield np.array(data[start:start + chunk_rows, column], dtype=float), 0
+
+
+def compute(chunks, bins=HISTOGRAM_BINS):
+    stats = StreamingStats(bins=bins)
+    skipped = 0
+    for values, bad in chunks:
+        stats.update(values)
+        skipped += bad
+    summary = stats.summary()
+    summary["skipped"] = skipped
+    return summary
+
+
+def compute_file(path, column=0, delimiter=",", header=True, bins=HISTOGRAM_BINS):
+    if path.endswith(".npy"):
+        return compute(iter_npy(path, column), bins)
+    with open(path, "r", encoding="utf-8") as f:
+        return compute(iter_csv_column(f, column, delimiter, header), bins)
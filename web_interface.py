@@ -1,10 +1,14 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 import math
-import fractions
 import io
+import json
+import threading
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+import analysis
+import matrix_mode
+import stats_mode
 
 app = Flask(__name__)
 
@@ -12,17 +16,77 @@ app = Flask(__name__)
 def index():
     return render_template("index.html")
 
+class SingleFlight:
+    # Concurrent calls with the same key share one execution of fn; callers
+    # that arrive while it is running wait for its result instead of
+    # recomputing it. Nothing is kept once the call finishes.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.stats = {}
+
+    def do(self, endpoint, key, fn):
+        key = (endpoint, key)
+        with self.lock:
+            counts = self.stats.setdefault(endpoint, {"requests": 0, "executions": 0, "coalesced": 0})
+            counts["requests"] += 1
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self.in_flight[key] = call
+                counts["executions"] += 1
+            else:
+                counts["coalesced"] += 1
+        if not leader:
+            call["done"].wait()
+        else:
+            try:
+                call["result"] = fn()
+            except BaseException as e:
+                call["error"] = e
+            finally:
+                with self.lock:
+                    del self.in_flight[key]
+                call["done"].set()
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+    def snapshot(self):
+        with self.lock:
+            return {endpoint: dict(counts) for endpoint, counts in self.stats.items()}
+
+single_flight = SingleFlight()
+
+def payload_key(data):
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
 @app.route("/calculate", methods=["POST"])
 def calculate():
     data = request.get_json()
     expression = data.get("expression", "")
-    try:
-        allowed_globals = {"__builtins__": None, "math": math, "fractions": fractions}
-        result = str(eval(expression, allowed_globals, {}))
-    except Exception as e:
-        result = "Error"
+    result = single_flight.do("calculate", payload_key(expression), lambda: analysis.evaluate_expression(expression))
     return jsonify({"result": result})
 
+def render_plot(func_str, x_min, x_max):
+    xs = [x_min + i*(x_max - x_min)/1000 for i in range(1001)]
+    ys = []
+    allowed_names = {"x": 0, "sin": math.sin, "cos": math.cos, "tan": math.tan,
+                     "sqrt": math.sqrt, "log": math.log, "log10": math.log10, "pi": math.pi,
+                     "e": math.e, "abs": abs, "pow": pow}
+    for x in xs:
+        allowed_names["x"] = x
+        y = eval(func_str, {"__builtins__": {}}, allowed_names)
+        ys.append(y)
+    fig, ax = plt.subplots(figsize=(5, 3))
+    ax.plot(xs, ys)
+    ax.set_title(f"f(x) = {func_str}")
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    plt.close(fig)
+    return buf.getvalue()
+
 @app.route("/plot", methods=["POST"])
 def plot():
     data = request.get_json()
@@ -32,25 +96,102 @@ def plot():
         x_max = float(data.get("x_max", 10))
         if x_min >= x_max:
             return jsonify({"error": "x_min must be less than x_max"}), 400
-        xs = [x_min + i*(x_max - x_min)/1000 for i in range(1001)]
-        ys = []
-        allowed_names = {"x": 0, "sin": math.sin, "cos": math.cos, "tan": math.tan,
-                         "sqrt": math.sqrt, "log": math.log, "log10": math.log10, "pi": math.pi,
-                         "e": math.e, "abs": abs, "pow": pow}
-        for x in xs:
-            allowed_names["x"] = x
-            y = eval(func_str, {"__builtins__": {}}, allowed_names)
-            ys.append(y)
-        fig, ax = plt.subplots(figsize=(5, 3))
-        ax.plot(xs, ys)
-        ax.set_title(f"f(x) = {func_str}")
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png")
-        buf.seek(0)
-        plt.close(fig)
-        return send_file(buf, mimetype="image/png")
+        png = single_flight.do("plot", payload_key([func_str, x_min, x_max]),
+                               lambda: render_plot(func_str, x_min, x_max))
+        return send_file(io.BytesIO(png), mimetype="image/png")
+    except Exception as e:
+        return jsonify({"error": "Error in function evaluation"}), 400
+
+@app.route("/metrics/coalescing")
+def coalescing_metrics():
+    return jsonify(single_flight.snapshot())
+
+def analysis_request(compute):
+    data = request.get_json()
+    func_str = data.get("function", "")
+    try:
+        return jsonify(compute(func_str, data))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": "Error in function evaluation"}), 400
+
+def float_list(values):
+    return [float(v) if math.isfinite(v) else None for v in values]
+
+@app.route("/integrate", methods=["POST"])
+def integrate():
+    return analysis_request(lambda f, data: {
+        "results": float_list(analysis.integrate(f, data.get("intervals", []),
+                                                 tol=float(data.get("tol", 1e-9))))
+    })
+
+@app.route("/roots", methods=["POST"])
+def roots():
+    return analysis_request(lambda f, data: {
+        "results": analysis.find_roots(f, data.get("intervals", []),
+                                       samples=min(int(data.get("samples", 1000)), 100000))
+    })
+
+@app.route("/derivative", methods=["POST"])
+def derivative():
+    return analysis_request(lambda f, data: {
+        "results": float_list(analysis.derivative(f, data.get("points", []),
+                                                  order=int(data.get("order", 1))).ravel())
+    })
+
+@app.route("/extrema", methods=["POST"])
+def extrema():
+    def compute(f, data):
+        found = analysis.find_extrema(f, data.get("intervals", []),
+                                      samples=min(int(data.get("samples", 1000)), 100000))
+        return {key: {"x": float_list(xs), "y": float_list(ys)} for key, (xs, ys) in found.items()}
+    return analysis_request(compute)
+
+@app.route("/matrix", methods=["POST"])
+def matrix():
+    data = request.get_json()
+    expression = data.get("expression", "")
+    try:
+        return jsonify(matrix_mode.to_json(matrix_mode.evaluate(expression)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": "Error in matrix expression"}), 400
+
+@app.route("/stats", methods=["POST"])
+def stats():
+    # Expects a multipart upload in "file"; Werkzeug spools large uploads to
+    # disk, and the CSV is then read from that stream in chunks.
+    upload = request.files.get("file")
+    if upload is None:
+        return jsonify({"error": "No file uploaded"}), 400
+    try:
+        bins = int(request.form.get("bins", stats_mode.HISTOGRAM_BINS))
+        lines = io.TextIOWrapper(upload.stream, encoding="utf-8")
+        chunks = stats_mode.iter_csv_column(lines, request.form.get("column", "0"),
+                                            request.form.get("delimiter", ","),
+                                            request.form.get("header", "1") not in ("0", "false"))
+        return jsonify(stats_mode.compute(chunks, bins))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": "Error reading data"}), 400
+
+@app.route("/table", methods=["POST"])
+def table():
+    data = request.get_json()
+    func_str = data.get("function", "")
+    fmt = data.get("format", "csv")
+    try:
+        chunks = analysis.generate_table(func_str, float(data.get("x_min", 0)), float(data.get("x_max", 10)),
+                                         float(data.get("step", 1)), fmt=fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Error in function evaluation"}), 400
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(stream_with_context(chunks), mimetype=mimetype)
 
 if __name__ == "__main__":
     app.run(debug=True)